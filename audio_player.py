@@ -1,10 +1,24 @@
 import sounddevice as sd
-from moviepy import *
-import time
+import numpy as np
+import json
+import os
+import subprocess
+import tempfile
 import threading
-import queue
+import time
 import logging
 
+# Valori predefiniti per lo stream: blocco richiesto a PortAudio e latenza di uscita
+AUDIO_BLOCKSIZE = 2048
+AUDIO_LATENCY = 'high'
+
+# Intervallo minimo tra due richieste di risincronizzazione (secondi)
+SYNC_MIN_INTERVAL = 0.05
+
+# Formato PCM richiesto a ffmpeg (s16le interleaved) se il dispositivo non è interrogabile
+AUDIO_SAMPLERATE = 44100
+AUDIO_CHANNELS = 2
+
 
 class AudioPlayer:
     """
@@ -18,178 +32,336 @@ class AudioPlayer:
         target_fps (float): FPS target per la riproduzione
         should_stop (threading.Event): Flag per la terminazione
         audio_thread (threading.Thread): Thread per la riproduzione dell'audio
-        sync_queue (queue.Queue): Coda per la sincronizzazione A/V
+        decode_thread (threading.Thread): Thread che decodifica l'audio in streaming
+        sync_thread (threading.Thread): Thread che calcola le risincronizzazioni A/V
         audio_time (float): Tempo corrente di riproduzione audio in secondi
         video_time (float): Tempo corrente di riproduzione video in secondi
         sync_tolerance (float): Tolleranza di sincronizzazione in secondi
+        blocksize (int): Frame per blocco dello stream audio (0 = scelta di PortAudio)
+        latency (float | str): Latenza di uscita in secondi, oppure 'low' / 'high'
+        sync_enabled (bool): Se False, l'audio non segue il video e viene scritto a grandi blocchi
         playback_started (bool): Indica se la riproduzione è iniziata
         resync_event (threading.Event): Flag per forzare la risincronizzazione
         initialized (bool): Indica se l'audio è stato inizializzato
     """
 
-    def __init__(self, video_path, target_fps=None):
+    def __init__(self, video_path, target_fps=None, blocksize=AUDIO_BLOCKSIZE, latency=AUDIO_LATENCY,
+                 sync_enabled=True):
         """
         Inizializza il player audio.
 
+        Blocchi e latenze più piccoli riducono il ritardo udibile e stringono la
+        sincronizzazione A/V, ma lasciano meno margine al thread di scrittura prima di
+        un underrun. Usare potenze di 2 per una schedulazione prevedibile, oppure 0 per
+        lasciare la scelta a PortAudio.
+
         Args:
             video_path (str): Percorso del file video
             target_fps (float, optional): FPS target per la riproduzione
+            blocksize (int): Frame per blocco dello stream audio (default: 2048)
+            latency (float | str): Latenza di uscita in secondi, oppure 'low' / 'high' (default: 'high')
+            sync_enabled (bool): Se False, riproduce l'audio senza risincronizzarlo sul video,
+                                 scrivendo a PortAudio tutto ciò che è già decodificato
         """
         self.video_path = video_path
         self.target_fps = target_fps
+        self.blocksize = blocksize
+        self.latency = latency
+        self.sync_enabled = sync_enabled
         self.should_stop = threading.Event()
         self.audio_thread = None
-        self.sync_queue = queue.Queue()
+        self.sync_thread = None
         self.audio_time = 0.0
         self.video_time = 0.0
         self.sync_tolerance = 0.1  # 100ms di tolleranza per la sincronizzazione
         self.logger = logging.getLogger('AudioPlayer')
         self.playback_started = False
         self.resync_event = threading.Event()
-        self.audio_clip = None
         self.stream = None
         self.audio_array = None
         self.samplerate = 0
         self.initialized = False
+        self._audio_file_path = None
+        self._channels = 0
+        self._nsamples = 0
+
+        # Stato della decodifica in streaming
+        self.decode_thread = None
+        self._decode_process = None
+        self._decode_cond = threading.Condition()
+        self._decoded_samples = 0
+        self._decode_done = False
+
+        # Slot singoli per la sincronizzazione A/V: conta solo l'ultimo valore, quindi
+        # basta un'assegnazione (atomica in CPython) senza code né lock
+        self._latest_video_time = 0.0
+        self._seek_samples = None  # Cursore richiesto dal thread di sync, se presente
+        self._last_sync_sent = 0.0  # Istante (monotonic) dell'ultima richiesta di resync
+        self._last_sync_value = None  # Tempo video dell'ultima richiesta di resync
 
     def initialize(self):
         """
         Inizializza l'audio estraendolo dal video.
 
-        Estrae la traccia audio dal video usando moviepy e la prepara per la riproduzione
-        con sounddevice.
+        Legge la durata della traccia audio con ffprobe, prepara un file temporaneo
+        mappato in memoria (PCM int16) e avvia il thread che lo riempie in streaming
+        dall'output di ffmpeg: la riproduzione può partire dopo il primo blocco invece
+        di attendere la decodifica completa.
 
         Returns:
             bool: True se l'inizializzazione è avvenuta con successo, False altrimenti
         """
         try:
-            # Estrai audio dal video usando moviepy
             self.logger.info(f"Estrazione audio da {self.video_path}")
-            video_clip = VideoFileClip(self.video_path)
-
-            # Ottieni l'audio clip dal video
-            self.audio_clip = video_clip.audio
-            if self.audio_clip is None:
+            duration = self._probe_audio_duration()
+            if duration is None:
                 self.logger.warning("Il video non contiene audio")
                 return False
 
-            # Ottieni i dati audio come array numpy
-            self.audio_array = self.audio_clip.to_soundarray()
-            self.samplerate = self.audio_clip.fps
-
-            # Mantieni l'audio in stereo se disponibile
-            if len(self.audio_array.shape) > 1 and self.audio_array.shape[1] > 1:
-                self.audio_array = self.audio_array
-
-            self.logger.info(f"Audio estratto: {self.samplerate} Hz, durata: {self.audio_clip.duration} sec")
+            # Prepara il np.memmap int16 (il formato dello stream) da riempire in streaming
+            self.samplerate, self._channels = self._output_device_format()
+            self._nsamples = int(duration * self.samplerate)
+
+            fd, self._audio_file_path = tempfile.mkstemp(prefix='pixellator_audio_', suffix='.s16')
+            os.close(fd)
+            self.audio_array = np.memmap(self._audio_file_path, dtype=np.int16, mode='w+',
+                                         shape=(self._nsamples, self._channels))
+
+            # ffmpeg decodifica, ricampiona al formato del dispositivo e converte a s16le
+            # interleaved una sola volta: PortAudio non deve convertire ad ogni blocco
+            self._decode_process = subprocess.Popen(
+                ['ffmpeg', '-v', 'error', '-i', self.video_path, '-vn',
+                 '-f', 's16le', '-acodec', 'pcm_s16le',
+                 '-ac', str(self._channels), '-ar', str(self.samplerate), '-'],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE
+            )
+
+            self._decoded_samples = 0
+            self._decode_done = False
+            self.decode_thread = threading.Thread(
+                target=self._decode_thread_func,
+                args=(self.audio_array,),
+                daemon=True
+            )
+            self.decode_thread.start()
+
+            self.logger.info(f"Decodifica audio avviata: {self.samplerate} Hz, durata: {duration} sec")
             self.initialized = True
             return True
         except Exception as e:
             self.logger.error(f"Errore nell'inizializzazione dell'audio: {e}")
             return False
 
-    def _audio_callback(self, outdata, frames, time_info, status):
+    def _output_device_format(self):
         """
-        Callback per il sounddevice stream.
+        Determina frequenza e numero di canali nativi del dispositivo di uscita.
 
-        Fornisce i dati audio da riprodurre e gestisce la sincronizzazione con il video
-        in tempo reale.
+        Returns:
+            tuple: (samplerate, channels) del dispositivo predefinito, oppure il formato
+                predefinito del player se il dispositivo non è interrogabile
+        """
+        try:
+            device = sd.query_devices(kind='output')
+            samplerate = int(device['default_samplerate'])
+            channels = min(AUDIO_CHANNELS, int(device['max_output_channels']))
+            if samplerate > 0 and channels > 0:
+                return samplerate, channels
+        except Exception as e:
+            self.logger.warning(f"Impossibile interrogare il dispositivo audio: {e}")
+        return AUDIO_SAMPLERATE, AUDIO_CHANNELS
 
-        Args:
-            outdata (numpy.ndarray): Buffer di output per i dati audio
-            frames (int): Numero di frame da fornire
-            time_info (dict): Informazioni sul tempo
-            status (CallbackFlags): Stato della riproduzione
+    def _probe_audio_duration(self):
+        """
+        Legge con ffprobe la durata del video, se contiene una traccia audio.
 
         Returns:
-            CallbackStop: Segnala la fine della riproduzione se necessario
+            float | None: Durata in secondi, oppure None se il video non ha audio
         """
-        if status:
-            self.logger.warning(f"Status audio: {status}")
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+             '-show_entries', 'stream=codec_type:format=duration', '-of', 'json', self.video_path],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            check=True
+        )
+        info = json.loads(result.stdout)
+        if not info.get('streams'):
+            return None
+        return float(info['format']['duration'])
 
-        # Calcola l'indice di inizio per i dati audio
-        start_idx = int(self.audio_time * self.samplerate)
-        end_idx = start_idx + frames
+    def _decode_thread_func(self, out):
+        """
+        Funzione per il thread di decodifica audio.
 
-        # Verifica se abbiamo raggiunto la fine dell'audio
-        if start_idx >= len(self.audio_array):
-            outdata.fill(0)
-            if not self.should_stop.is_set():
-                self.should_stop.set()
-            return sd.CallbackStop
+        Legge il PCM int16 prodotto da ffmpeg direttamente nel buffer del memmap con
+        ``readinto()`` (nessuna copia intermedia in Python), un secondo alla volta, e
+        pubblica dopo ogni blocco il numero di campioni disponibili. Il file resta su
+        disco: i salti della risincronizzazione, anche all'indietro, trovano sempre i
+        dati, mentre in RAM restano solo le pagine calde della page cache.
 
-        # Aggiorna il tempo audio corrente
-        self.audio_time += frames / self.samplerate
+        Args:
+            out (numpy.memmap): Array (campioni, canali) da riempire
+        """
+        process = self._decode_process
+        frame_bytes = self._channels * out.itemsize
+        chunk_bytes = self.samplerate * frame_bytes
+        buffer = memoryview(out).cast('B')
+        total_bytes = len(buffer)
+        pos = 0
 
-        # Verifica di sincronizzazione con il video
         try:
-            # Controlla se ci sono comandi di sincronizzazione nella coda
-            while not self.sync_queue.empty():
-                cmd = self.sync_queue.get_nowait()
-                if cmd["type"] == "set_time":
-                    # Aggiorna il tempo audio
-                    new_time = cmd["time"]
-                    self.logger.debug(f"Sincronizzazione: audio={self.audio_time:.3f}, video={new_time:.3f}")
-
-                    # Se la differenza è significativa, risincronizza
-                    if abs(self.audio_time - new_time) > self.sync_tolerance:
-                        self.audio_time = new_time
-                        start_idx = int(new_time * self.samplerate)
-                        end_idx = start_idx + frames
-                        self.logger.info(f"Risincronizzazione audio a {new_time:.3f}s")
-        except queue.Empty:
-            pass
-
-        # Copia i dati audio nel buffer di output
-        if end_idx <= len(self.audio_array):
-            if len(self.audio_array.shape) > 1:  # Stereo
-                outdata[:] = self.audio_array[start_idx:end_idx]
-            else:  # Mono
-                outdata[:, 0] = self.audio_array[start_idx:end_idx]
-        else:
-            # Gestisci il caso in cui raggiungiamo la fine dell'audio
-            remaining = len(self.audio_array) - start_idx
-            if remaining > 0:
-                if len(self.audio_array.shape) > 1:  # Stereo
-                    outdata[:remaining] = self.audio_array[start_idx:]
-                else:  # Mono
-                    outdata[:remaining, 0] = self.audio_array[start_idx:]
-                outdata[remaining:] = 0
-            else:
-                outdata.fill(0)
-
-            # Segnala la fine dell'audio
-            if not self.should_stop.is_set():
-                self.should_stop.set()
-            return sd.CallbackStop
+            while pos < total_bytes and not self.should_stop.is_set():
+                read = process.stdout.readinto(buffer[pos:min(pos + chunk_bytes, total_bytes)])
+                if not read:
+                    break
+                pos += read
+
+                with self._decode_cond:
+                    self._decoded_samples = pos // frame_bytes
+                    self._decode_cond.notify_all()
+        except Exception as e:
+            self.logger.error(f"Errore nella decodifica audio: {e}")
+        finally:
+            # ffmpeg può produrre qualche campione oltre la durata stimata: non serve
+            process.kill()
+            process.wait()
+            buffer.release()
+            with self._decode_cond:
+                self._decode_done = True
+                self._decode_cond.notify_all()
+            self.logger.info(f"Decodifica audio terminata: {pos // frame_bytes} campioni")
+
+    def _remove_audio_file(self):
+        """
+        Rilascia il memmap audio ed elimina il file temporaneo associato.
+        """
+        self.audio_array = None
+        if self._audio_file_path:
+            try:
+                os.unlink(self._audio_file_path)
+            except OSError as e:
+                self.logger.error(f"Errore durante la rimozione del file audio temporaneo: {e}")
+            self._audio_file_path = None
 
-    def _audio_thread_func(self):
+    def _audio_thread_func(self, audio):
         """
         Funzione per il thread di riproduzione audio.
 
-        Avvia lo stream audio e gestisce il ciclo di vita della riproduzione.
+        Scrive l'audio sullo stream a blocchi con chiamate bloccanti a ``stream.write()``:
+        l'attesa avviene interamente in C, quindi nessun codice Python gira sul thread
+        realtime di PortAudio. Il loop si limita a copiare campioni: tra una scrittura
+        e l'altra applica il cursore calcolato dal thread di sincronizzazione.
+
+        Args:
+            audio (memoryview): Vista a byte dei campioni, creata da start(); il thread la
+                                rilascia al termine
         """
         self.logger.info("Thread audio avviato")
 
+        frame_bytes = self._channels * np.dtype(np.int16).itemsize
+        samplerate = self.samplerate
+        write_chunk = self.blocksize or AUDIO_BLOCKSIZE
+        sync_enabled = self.sync_enabled
+        stream = None
+        underflows = 0  # Contati nel loop, registrati nel log solo alla fine
+
         try:
-            # Crea uno stream audio
-            with sd.OutputStream(
-                    samplerate=self.samplerate,
-                    channels=2 if len(self.audio_array.shape) > 1 else 1,
-                    callback=self._audio_callback
-            ) as self.stream:
-                self.logger.info("Riproduzione audio avviata")
-                self.playback_started = True
-
-                # Attendi che il thread debba terminare
-                while not self.should_stop.is_set():
-                    time.sleep(0.1)
+            # Crea uno stream audio raw in modalità bloccante (senza callback): write()
+            # passa il buffer a PortAudio così com'è, senza i controlli numpy di OutputStream
+            stream = sd.RawOutputStream(
+                samplerate=samplerate,
+                channels=self._channels,
+                dtype='int16',
+                blocksize=self.blocksize,
+                latency=self.latency
+            )
+            self.stream = stream
+            stream.start()
+            self.logger.info("Riproduzione audio avviata")
+            self.playback_started = True
+
+            cursor = int(self.audio_time * samplerate)
+
+            # Riferimenti locali per il loop: LOAD_FAST invece di lookup di attributi.
+            # _seek_samples e lo stato del decoder cambiano da altri thread e vanno
+            # invece riletti ad ogni iterazione.
+            stopping = self.should_stop.is_set
+            write = stream.write
+            decode_cond = self._decode_cond
+
+            while not stopping():
+                # Applica l'eventuale risincronizzazione richiesta
+                seek = self._seek_samples
+                if seek is not None:
+                    self._seek_samples = None
+                    cursor = seek
+
+                # Con la sincronizzazione si scrivono blocchi piccoli per poter saltare
+                # presto; senza, si passa a PortAudio tutto ciò che è già decodificato
+                end = cursor + write_chunk
+                if not sync_enabled:
+                    end = max(end, self._decoded_samples)
+
+                # Attendi che il decoder abbia prodotto il blocco richiesto
+                if end > self._decoded_samples and not self._decode_done:
+                    with decode_cond:
+                        decode_cond.wait_for(
+                            lambda: self._decoded_samples >= end or self._decode_done or stopping())
+                    continue
+
+                if cursor >= self._decoded_samples:
+                    break
+
+                # Scrive il blocco successivo (bloccante, un'unica memcpy in C)
+                chunk = audio[cursor * frame_bytes:end * frame_bytes]
+                if write(chunk):
+                    underflows += 1
+                cursor += len(chunk) // frame_bytes
+                self.audio_time = cursor / samplerate
+
+            # Segnala la fine dell'audio
+            if not self.should_stop.is_set():
+                self.should_stop.set()
+                stream.stop()
 
         except Exception as e:
-            self.logger.error(f"Errore nella riproduzione audio: {e}")
+            # Un errore dopo stop() è atteso: abort() interrompe la write in corso
+            if not self.should_stop.is_set():
+                self.logger.error(f"Errore nella riproduzione audio: {e}")
         finally:
+            if stream is not None:
+                stream.close()
+                self.stream = None
+            audio.release()
+            if underflows:
+                self.logger.warning(f"Underrun audio durante la riproduzione: {underflows}")
+            # Sveglia il thread di sincronizzazione per farlo terminare
+            self.resync_event.set()
             self.logger.info("Thread audio terminato")
 
+    def _sync_thread_func(self):
+        """
+        Funzione per il thread di sincronizzazione audio/video.
+
+        Resta in attesa su ``resync_event`` e, quando il video si discosta dall'audio,
+        calcola il nuovo cursore in campioni e lo pubblica al thread di riproduzione.
+        Confronti e logging restano così fuori dal loop di scrittura.
+        """
+        while True:
+            self.resync_event.wait()
+            if self.should_stop.is_set():
+                break
+            self.resync_event.clear()
+
+            new_time = self._latest_video_time
+            self.logger.debug(f"Sincronizzazione: audio={self.audio_time:.3f}, video={new_time:.3f}")
+
+            # Ricontrolla: l'audio potrebbe essersi già riallineato nel frattempo
+            if abs(self.audio_time - new_time) > self.sync_tolerance:
+                self._seek_samples = int(new_time * self.samplerate)
+                self.logger.info(f"Risincronizzazione audio a {new_time:.3f}s")
+
     def start(self):
         """
         Avvia la riproduzione dell'audio.
@@ -203,32 +375,55 @@ class AudioPlayer:
             self.logger.warning("Audio non disponibile o non inizializzato")
             return False
 
+        # Vista a byte di un buffer C-contiguo (nessuna copia se il memmap lo è già):
+        # ogni blocco passato a write() è una slice di memoryview, senza oggetti numpy.
+        # Creata qui e passata al thread, che non dipende da audio_array (azzerato da stop())
+        audio = memoryview(np.ascontiguousarray(self.audio_array)).cast('B')
+
         # Avvia il thread audio
         self.audio_thread = threading.Thread(
             target=self._audio_thread_func,
+            args=(audio,),
             daemon=True
         )
         self.audio_thread.start()
+
+        # Avvia il thread di sincronizzazione
+        self.sync_thread = threading.Thread(
+            target=self._sync_thread_func,
+            daemon=True
+        )
+        self.sync_thread.start()
         return True
 
     def update_video_time(self, current_time):
         """
         Aggiorna il tempo di riproduzione video e gestisce la sincronizzazione.
 
-        Confronta il tempo video con il tempo audio e invia comandi di sincronizzazione
-        quando necessario.
+        Pubblica il tempo video e, se la differenza con l'audio supera la tolleranza,
+        sveglia il thread di sincronizzazione. Le richieste ravvicinate vengono
+        accorpate: finché l'audio non ha applicato l'ultima, inviarne altre per tempi
+        quasi identici non serve.
 
         Args:
             current_time (float): Tempo corrente di riproduzione video in secondi
         """
         self.video_time = current_time
 
-        # Invia un comando di sincronizzazione se la differenza è significativa
-        if abs(self.audio_time - self.video_time) > self.sync_tolerance:
-            self.sync_queue.put({
-                "type": "set_time",
-                "time": current_time
-            })
+        if not self.sync_enabled or abs(self.audio_time - current_time) <= self.sync_tolerance:
+            return
+
+        now = time.monotonic()
+        if now - self._last_sync_sent < SYNC_MIN_INTERVAL:
+            return
+        if self._last_sync_value is not None and \
+                abs(current_time - self._last_sync_value) <= self.sync_tolerance / 2:
+            return
+
+        self._last_sync_sent = now
+        self._last_sync_value = current_time
+        self._latest_video_time = current_time
+        self.resync_event.set()
 
     def stop(self):
         """
@@ -237,38 +432,44 @@ class AudioPlayer:
         Implementa una chiusura non bloccante con un timeout molto breve per evitare
         di bloccare l'applicazione durante la chiusura.
         """
-        if not hasattr(self, 'should_stop') or self.should_stop.is_set():
-            # Già in fase di chiusura o non inizializzato
+        if self.should_stop.is_set():
+            # Già in fase di chiusura o riproduzione terminata
+            self._remove_audio_file()
             return
 
         self.logger.info("Arresto riproduzione audio")
         self.should_stop.set()
+        self.resync_event.set()
 
-        # Timeout ridotto per il join del thread audio
-        if hasattr(self, 'audio_thread') and self.audio_thread and self.audio_thread.is_alive():
-            # Timeout di soli 100ms - se non termina velocemente, continuiamo
-            self.audio_thread.join(timeout=0.1)
+        # Sveglia il thread audio se è in attesa del decoder
+        with self._decode_cond:
+            self._decode_cond.notify_all()
 
-        # Chiudi le risorse audio in modo non bloccante
-        if hasattr(self, 'stream') and self.stream:
+        # Interrompi subito lo stream: sblocca la write() in corso nel thread audio
+        if self.stream:
             try:
-                # Interrompi il callback loop di sounddevice
                 self.stream.abort()
             except Exception as e:
                 self.logger.error(f"Errore durante l'abort dello stream audio: {e}")
-            finally:
-                self.stream = None
 
-        # Rilascia l'audio clip
-        if hasattr(self, 'audio_clip') and self.audio_clip:
-            try:
-                self.audio_clip = None  # Rilascia immediatamente il riferimento
-            except Exception as e:
-                self.logger.error(f"Errore durante la chiusura dell'audio clip: {e}")
+        # Rilascia subito il riferimento al buffer: i thread usano le proprie viste
+        self.audio_array = None
+
+        # Timeout ridotto per il join del thread audio
+        if self.audio_thread and self.audio_thread.is_alive():
+            # Timeout di soli 100ms - se non termina velocemente, continuiamo
+            self.audio_thread.join(timeout=0.1)
+
+        # Termina ffmpeg: sblocca il decoder se è in attesa sulla pipe
+        if self._decode_process and self._decode_process.poll() is None:
+            self._decode_process.kill()
+
+        # Il decoder controlla should_stop ad ogni blocco (un secondo di audio)
+        if self.decode_thread and self.decode_thread.is_alive():
+            self.decode_thread.join(timeout=0.1)
 
-        # Rilascia immediatamente le risorse di memoria
-        if hasattr(self, 'audio_array'):
-            self.audio_array = None
+        # Elimina il file temporaneo
+        self._remove_audio_file()
 
         self.initialized = False
         self.playback_started = False
@@ -34,30 +34,23 @@ def generate_calibration_frame(width, height):
     width = max(3, width)
     height = max(3, height)
 
-    # Pre-allocazione delle stringhe di riga
-    rows = [BORDER_CHAR * width]  # Riga superiore (bordo)
-
-    # Righe intermedie
-    for y in range(1, height - 1):
-        if y == height // 2:
-            # Riga centrale con croce
-            row = BORDER_CHAR + CROSS_CHAR * (width - 2) + BORDER_CHAR
-        else:
-            # Riga normale con bordi
-            row = BORDER_CHAR + WHITE_CHAR * (width - 2) + BORDER_CHAR
-        rows.append(row)
-
-    # Riga inferiore (bordo)
-    if height > 1:
-        rows.append(BORDER_CHAR * width)
-
-    # Sovrascrivere la croce verticale
     center_x = width // 2
-    for y in range(1, height - 1):
-        if y != height // 2:  # Salta la riga centrale (già con croce)
-            row_list = list(rows[y])
-            row_list[center_x] = CROSS_CHAR
-            rows[y] = "".join(row_list)
+    center_y = height // 2
+
+    # Modelli delle tre righe distinte, costruiti una sola volta
+    border_row = BORDER_CHAR * width
+    # Riga normale con bordi e croce verticale
+    inner_row = (BORDER_CHAR + WHITE_CHAR * (center_x - 1) + CROSS_CHAR +
+                 WHITE_CHAR * (width - center_x - 2) + BORDER_CHAR)
+    # Riga centrale con croce
+    cross_row = BORDER_CHAR + CROSS_CHAR * (width - 2) + BORDER_CHAR
+
+    # Le righe intermedie sono ripetizioni dello stesso modello
+    rows = ([border_row] +
+            [inner_row] * (center_y - 1) +
+            [cross_row] +
+            [inner_row] * (height - center_y - 2) +
+            [border_row])
 
     return "\n".join(rows)
 
@@ -2,7 +2,6 @@ import argparse
 import logging
 import signal
 import sys
-import time
 import os
 import cv2
 
@@ -44,6 +43,8 @@ def main():
                         help="Path to a custom palette file. It can be a normal .txt file.")
     parser.add_argument("--no-loop", action="store_true", help="Disable video looping (stop when video ends)")
     parser.add_argument("--audio", action="store_true", help="Enable audio playback")
+    parser.add_argument("--audio-no-sync", action="store_true",
+                        help="Play audio without resynchronizing it to the video (requires --audio)")
 
     args = parser.parse_args()
 
@@ -55,12 +56,14 @@ def main():
     # Verifica delle dipendenze per l'audio
     if args.audio:
         try:
+            import shutil
             import sounddevice
-            from moviepy import AudioFileClip
+            if shutil.which('ffmpeg') is None or shutil.which('ffprobe') is None:
+                raise ImportError("ffmpeg/ffprobe non trovati nel PATH")
             print("Dipendenze audio verificate con successo.")
         except ImportError as e:
             print(f"Errore: impossibile abilitare l'audio. Mancano le dipendenze necessarie: {e}")
-            print("Per abilitare l'audio, installa: pip install sounddevice moviepy")
+            print("Per abilitare l'audio, installa: pip install sounddevice, e ffmpeg")
             print("Continuo senza audio...")
             args.audio = False
 
@@ -175,7 +178,8 @@ def main():
         args.log_fps,
         ascii_palette=ascii_palette,
         loop_video=not args.no_loop,
-        enable_audio=args.audio
+        enable_audio=args.audio,
+        audio_sync=not args.audio_no_sync
     )
 
     # Gestione dei segnali per una chiusura pulita
@@ -209,9 +213,10 @@ def main():
         if args.audio:
             print("Audio abilitato")
 
-        # Attendi che l'utente interrompa l'esecuzione o che il video finisca
-        while not pipeline.should_stop.is_set():
-            time.sleep(1)
+        # Attendi che l'utente interrompa l'esecuzione o che il video finisca: il thread
+        # principale resta sospeso sull'evento, senza risvegli periodici, e i segnali
+        # interrompono comunque l'attesa
+        pipeline.should_stop.wait()
     except KeyboardInterrupt:
         logger.info("Interruzione da tastiera")
     finally:
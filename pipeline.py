@@ -4,33 +4,214 @@ import queue
 import threading
 import logging
 import multiprocessing
+import signal
+import os
+
+try:
+    # Coda inter-processo in C su memoria condivisa, senza thread feeder (opzionale)
+    from faster_fifo import Queue as FastQueue
+except ImportError:
+    FastQueue = None
 
 # Marker per segnalare la fine del video
 END_OF_VIDEO_MARKER = "END_OF_VIDEO"
 
+# Attesa (secondi) oltre il tempo di riproduzione di un elemento della coda ASCII prima di
+# considerare il renderer bloccato
+RENDERER_STALL_MARGIN = 0.5
+
+
+def build_cell_table(cells):
+    """
+    Costruisce la tabella dei byte UTF-8 delle celle di output.
+
+    Ogni riga della tabella contiene i byte di una cella (sequenza ANSI + carattere),
+    completati con byte NUL fino alla lunghezza della cella più lunga: così le celle
+    di un frame si assemblano con un'unica indicizzazione vettoriale.
+
+    Args:
+        cells (list): Stringhe delle celle, nell'ordine degli indici usati per il lookup
 
-def frame_reader_process(video_path, frame_queue, should_stop, target_fps, batch_size, loop_video=True):
+    Returns:
+        numpy.ndarray: Tabella uint8 di forma (len(cells), lunghezza massima in byte)
+    """
+    import numpy as np
+
+    encoded = [cell.encode('utf-8') for cell in cells]
+    table = np.zeros((len(encoded), max(len(cell) for cell in encoded)), dtype=np.uint8)
+    for i, cell in enumerate(encoded):
+        table[i, :len(cell)] = np.frombuffer(cell, dtype=np.uint8)
+    return table
+
+
+def render_cells(cell_table, cell_indices, row_end, buffer=None):
+    """
+    Assembla un frame di output a partire dagli indici delle celle.
+
+    Copia i byte delle celle in un unico buffer (H, W*K + len(row_end)) che termina ogni
+    riga con row_end e rimuove il padding NUL con una sola passata in C,
+    senza cicli Python sui pixel. Le righe vengono restituite già separate, pronte
+    per il rendering parziale.
+
+    Args:
+        cell_table (numpy.ndarray): Tabella prodotta da build_cell_table
+        cell_indices (numpy.ndarray): Indici (H, W) delle celle nella tabella
+        row_end (bytes): Byte da aggiungere alla fine di ogni riga (incluso il newline)
+        buffer (numpy.ndarray, optional): Buffer uint8 (H, W*K + len(row_end)) da riutilizzare,
+            con row_end già scritto nelle ultime colonne; se assente ne viene allocato uno nuovo
+
+    Returns:
+        list: Righe del frame in bytes UTF-8, senza newline
+    """
+    import numpy as np
+
+    height, width = cell_indices.shape
+    cells_bytes = width * cell_table.shape[1]
+
+    if buffer is None:
+        buffer = np.empty((height, cells_bytes + len(row_end)), dtype=np.uint8)
+        buffer[:, cells_bytes:] = np.frombuffer(row_end, dtype=np.uint8)
+    # Gather diretto nel buffer di output, senza l'array intermedio di cell_table[cell_indices]
+    np.take(cell_table, cell_indices, axis=0, mode='clip',
+            out=buffer[:, :cells_bytes].reshape(height, width, cell_table.shape[1]))
+
+    # Rimuove il padding e il newline dopo l'ultima riga, poi separa le righe
+    return buffer.tobytes().replace(b'\0', b'')[:-1].split(b'\n')
+
+
+def pin_to_cores(cores):
+    """
+    Limita il thread chiamante ai core indicati.
+
+    Disponibile solo su Linux: su macOS e Windows non esegue alcun pinning.
+
+    Args:
+        cores (set): Indici dei core consentiti
+
+    Returns:
+        bool: True se l'affinità è stata applicata
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        os.sched_setaffinity(0, cores)
+        return True
+    except OSError:
+        return False
+
+
+def frame_reader_process(video_path, frame_queue, should_stop, batch_size, loop_video=True,
+                         frame_slots=None, free_slots=None):
     """
     Processo dedicato alla lettura dei frame dal video.
 
-    Estrae frame dal video a una velocità controllata e li invia alla coda
-    per la conversione. Gestisce anche il loop del video se richiesto.
+    Estrae frame dal video e li invia alla coda per la conversione. Non applica
+    alcun ritardo: la coda limitata rallenta la lettura quando il resto della pipeline
+    è indietro, mentre la cadenza di riproduzione è gestita dal renderer.
+    Gestisce anche il loop del video se richiesto.
 
     Args:
         video_path (str): Percorso del file video
         frame_queue (multiprocessing.Queue): Coda per i frame video
         should_stop (multiprocessing.Event): Flag per la terminazione
-        target_fps (int): FPS target per l'estrazione dei frame
         batch_size (int): Numero di frame da processare in batch
         loop_video (bool): Se True, riavvia il video quando raggiunge la fine
+        frame_slots (list, optional): Slot di memoria condivisa (multiprocessing.RawArray) per i frame
+        free_slots (multiprocessing.Queue, optional): Coda degli indici degli slot liberi
     """
     # Configura logging locale per questo processo
     from utils import configure_process_logging
+    import numpy as np
     logger = configure_process_logging("Reader", console_level=logging.WARNING)
 
+    def acquire_slot():
+        """
+        Attende uno slot di memoria condivisa libero: il converter li restituisce dopo la conversione.
+
+        Returns:
+            int | None: Indice dello slot o None se la pipeline è in arresto
+        """
+        while not should_stop.is_set():
+            try:
+                return free_slots.get(block=True, timeout=0.5)
+            except queue.Empty:
+                continue
+        return None
+
+    def read_frame():
+        """
+        Legge il prossimo frame, decodificandolo direttamente in uno slot condiviso.
+
+        Nella coda viaggia solo (indice slot, forma), senza serializzare né copiare i pixel:
+        con gli slot attivi i frame non passano mai per valore. Senza slot configurati
+        restituisce il frame stesso.
+
+        Returns:
+            tuple: (successo, slot condiviso (indice, forma) o frame; None se da saltare o in arresto)
+        """
+        if not slot_views:
+            return video.read()
+
+        slot = acquire_slot()
+        if slot is None:
+            return True, None
+
+        # Il decoder scrive nel buffer fornito se la forma coincide, altrimenti ne alloca uno nuovo
+        success, frame = video.read(image=slot_views[slot])
+        if success and frame is not slot_views[slot]:
+            # Forma diversa da quella dichiarata dal container: copia nello slot se c'è spazio
+            if frame.nbytes <= len(frame_slots[slot]):
+                view = np.frombuffer(frame_slots[slot], dtype=np.uint8, count=frame.size).reshape(frame.shape)
+                np.copyto(view, frame)
+            else:
+                logger.warning(f"Frame {frame.shape} più grande dello slot condiviso, saltato")
+                free_slots.put(slot)
+                return True, None
+        if success:
+            return True, (slot, frame.shape)
+
+        free_slots.put(slot)
+        return False, None
+
+    def release_frames(items):
+        """
+        Restituisce gli slot dei frame scartati alla coda degli slot liberi.
+
+        Args:
+            items (list): Elementi del batch non inviati al converter
+        """
+        for item in items:
+            if isinstance(item, tuple):
+                free_slots.put(item[0])
+
+    def put_blocking(item):
+        """
+        Inserisce un elemento nella coda dei frame attendendo che si liberi spazio.
+
+        Args:
+            item: Batch di frame o marker di fine video
+
+        Returns:
+            bool: True se inserito, False se la pipeline è in arresto
+        """
+        while not should_stop.is_set():
+            try:
+                frame_queue.put(item, block=True, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
     try:
         logger.info("Avvio processo di lettura frame")
-        video = cv2.VideoCapture(video_path)
+        # Decodifica hardware (NVDEC, VA-API, D3D11...) se OpenCV e la piattaforma la supportano:
+        # lascia i core liberi per la conversione. Senza acceleratore OpenCV decodifica in software
+        video = None
+        if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            video = cv2.VideoCapture(video_path, cv2.CAP_ANY,
+                                     [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if video is None or not video.isOpened():
+            video = cv2.VideoCapture(video_path)
         if not video.isOpened():
             logger.error(f"Impossibile aprire il video: {video_path}")
             should_stop.set()
@@ -39,47 +220,38 @@ def frame_reader_process(video_path, frame_queue, should_stop, target_fps, batch
         # Ottieni informazioni sul video
         original_fps = video.get(cv2.CAP_PROP_FPS)
         total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_shape = (int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(video.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
         logger.info(f"Video aperto: {video_path}, FPS: {original_fps}, Frames totali: {total_frames}")
+        if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            logger.info(f"Accelerazione hardware della decodifica: {int(video.get(cv2.CAP_PROP_HW_ACCELERATION))}")
 
-        # Calcola il ritardo necessario per rispettare il target FPS
-        if target_fps and target_fps < original_fps:
-            frame_delay = 1.0 / target_fps
-        else:
-            frame_delay = 1.0 / original_fps
+        # Viste NumPy sugli slot condivisi, usate come destinazione della decodifica
+        slot_views = None
+        if frame_slots and len(frame_slots[0]) == frame_shape[0] * frame_shape[1] * frame_shape[2]:
+            slot_views = [np.frombuffer(slot, dtype=np.uint8).reshape(frame_shape) for slot in frame_slots]
 
         # Leggi i frame in batch
         batch = []
-        last_read_time = time.time()
         frame_count = 0
 
         while not should_stop.is_set():
-            if target_fps:
-                # Rispetta il target FPS
-                current_time = time.time()
-                elapsed = current_time - last_read_time
-                if elapsed < frame_delay:
-                    time.sleep(frame_delay - elapsed)
-
             # Leggi il frame
-            success, frame = video.read()
+            success, frame = read_frame()
+            if success and frame is None:
+                # Frame saltato o arresto durante l'attesa di uno slot libero
+                continue
             if not success:
                 # Fine del video
                 logger.info("Fine del video raggiunta")
 
                 # Invia gli ultimi frame in batch se presenti
-                if batch:
-                    try:
-                        frame_queue.put(batch, block=True, timeout=1)
-                    except queue.Full:
-                        pass
+                if batch and not put_blocking(batch):
+                    release_frames(batch)
 
                 # Se loop_video è False, invia il marker di fine video e termina
                 if not loop_video:
                     logger.info("Invio marker di fine video")
-                    try:
-                        frame_queue.put(END_OF_VIDEO_MARKER, block=True, timeout=1)
-                    except queue.Full:
-                        pass
+                    put_blocking(END_OF_VIDEO_MARKER)
                     logger.info("Loop disabilitato, terminazione del processo di lettura")
                     break
 
@@ -92,24 +264,12 @@ def frame_reader_process(video_path, frame_queue, should_stop, target_fps, batch
             batch.append(frame)
             frame_count += 1
 
-            # Quando il batch è completo, invialo alla coda
+            # Quando il batch è completo, invialo alla coda (attende se è piena)
             if len(batch) >= batch_size:
-                try:
-                    frame_queue.put(batch, block=True, timeout=1)
-                    batch = []
-                    last_read_time = time.time()
-                except queue.Full:
-                    # Gestione adattiva di code piene
-                    time.sleep(0.1)
-                    reduced_batch = batch[:batch_size // 2]
-                    try:
-                        frame_queue.put(reduced_batch, block=False)
-                        batch = batch[batch_size // 2:]
-                        last_read_time = time.time()
-                    except queue.Full:
-                        # Salta alcuni frame se la coda è ancora piena
-                        batch = batch[1:]
-                        logger.warning("Coda frame piena, saltando frame")
+                if not put_blocking(batch):
+                    release_frames(batch)
+                    break
+                batch = []
     except Exception as e:
         logger.error(f"Errore nel processo di lettura frame: {e}")
     finally:
@@ -117,33 +277,51 @@ def frame_reader_process(video_path, frame_queue, should_stop, target_fps, batch
         logger.info("Processo di lettura frame terminato")
 
 
-def frame_converter_process(width, frame_queue, ascii_queue, should_stop, ascii_palette=None):
+def frame_converter_thread(width, frame_queue, ascii_queue, should_stop, ascii_palette=None,
+                           frame_slots=None, free_slots=None, log_performance=False, worker_cores=None,
+                           frame_interval=None):
     """
-    Processo dedicato alla conversione dei frame in ASCII.
+    Thread dedicato alla conversione dei frame in ASCII.
 
     Implementa ottimizzazioni per l'elaborazione di batch e utilizza NumPy per
-    conversioni vettorizzate ad alte prestazioni.
+    conversioni vettorizzate ad alte prestazioni. Viene eseguito nel processo
+    principale: i frame convertiti arrivano al renderer senza serializzazione.
+
+    Ogni elemento della coda ASCII è una coppia (indice progressivo del primo frame, frame):
+    il numero conta anche i frame scartati, così il renderer mantiene corretto il tempo video.
 
     Args:
         width (int): Larghezza dell'output ASCII
         frame_queue (multiprocessing.Queue): Coda per i frame video
-        ascii_queue (multiprocessing.Queue): Coda per i frame ASCII convertiti
+        ascii_queue (queue.Queue): Coda per i frame ASCII convertiti, in coppie (indice del primo frame, frame)
         should_stop (multiprocessing.Event): Flag per la terminazione
         ascii_palette (str, optional): Stringa di caratteri ASCII da usare per la conversione
+        frame_slots (list, optional): Slot di memoria condivisa (multiprocessing.RawArray) per i frame
+        free_slots (multiprocessing.Queue, optional): Coda degli indici degli slot liberi
+        log_performance (bool): Se True, misura e registra i tempi di conversione
+        worker_cores (list, optional): Core su cui fissare i thread del pool, assegnati a turno
+        frame_interval (float, optional): Intervallo di riproduzione tra due frame, usato per
+            riconoscere un renderer bloccato (None = renderer senza limitazione)
     """
-    # Configura logging locale per questo processo
+    # Configura logging locale per questo thread
     from utils import configure_process_logging
     import cv2
     import time
     import queue
     import numpy as np
+    from collections import deque
+    from concurrent.futures import Future
+    from functools import lru_cache
 
     logger = configure_process_logging("Converter", console_level=logging.WARNING)
 
     box_palette = False
+    worker_queues = []
+    pending = deque()
+    dropped_frames = 0
 
     try:
-        logger.info(f"Avvio processo di conversione frame con larghezza={width}")
+        logger.info(f"Avvio thread di conversione frame con larghezza={width}")
 
         # Prepara la palette di caratteri ASCII
         if ascii_palette:
@@ -172,222 +350,565 @@ def frame_converter_process(width, frame_queue, ascii_queue, should_stop, ascii_
                     color_code = color_lookup[r, g, b]
                     color_sequences[color_code] = f"\033[38;5;{color_code}m"
 
+        # Lookup table valore del canale (0-255) -> livello del cubo colori 6x6x6 (0-5),
+        # equivalente a min(5, valore // 43) ma con un'unica indicizzazione per canale
+        channel_to_level = np.minimum(5, np.arange(256, dtype=np.intp) // 43)
+
         # Cache per sequenze ANSI comuni
         RESET_SEQ = "\033[0m"
-
-        height_scale = None
-        last_shape = None
+        ROW_END = (RESET_SEQ + "\n").encode('utf-8')
+
+        # Tabella delle celle (colore, carattere): indice = (colore - 16) * n_caratteri + carattere.
+        # In coda seguono le celle senza sequenza colore, usate quando una cella ha lo stesso
+        # colore di quella alla sua sinistra (il colore del terminale resta attivo)
+        if not box_palette:
+            # Lookup table luminosità -> indice del carattere (256 voci, calcolata una volta)
+            brightness_to_index = np.arange(256, dtype=np.uint32) * (len(ascii_chars) - 1) // 255
+            char_count = len(ascii_chars)
+
+            char_cell_table = build_cell_table([
+                color_sequences[16 + color_index] + char
+                for color_index in range(216)
+                for char in ascii_chars
+            ] + list(ascii_chars))
+            # Tipo intero più piccolo che contiene tutti gli indici della tabella (di norma uint16):
+            # dimezza o più i byte letti e scritti rispetto a intp nel calcolo degli indici
+            cell_index_dtype = np.min_scalar_type(len(char_cell_table) - 1)
+            plain_cells_offset = cell_index_dtype.type(216 * char_count)
+
+            # Versione uint8 per cv2.LUT, se la palette ha al più 256 caratteri
+            brightness_lut = brightness_to_index.astype(np.uint8) if char_count <= 256 else None
+        else:
+            # Modalità box: una cella per colore con il carattere blocco Unicode
+            block_cell_table = build_cell_table([
+                color_sequences[16 + color_index] + '█'
+                for color_index in range(216)
+            ] + ['█'])
+            cell_index_dtype = np.min_scalar_type(len(block_cell_table) - 1)
+            plain_cells_offset = cell_index_dtype.type(216)
+
+        # Lookup table per cv2.LUT con il contributo di ciascun canale BGR all'indice del colore
+        # (livello, 6 * livello, 36 * livello): la somma, fatta da cv2.transform, vale al massimo
+        # 215 e resta in uint8. Entrambe le funzioni sono vettorizzate SIMD, a differenza
+        # dell'indicizzazione NumPy con array di indici
+        channel_lut = np.stack([channel_to_level, 6 * channel_to_level, 36 * channel_to_level],
+                               axis=-1).astype(np.uint8).reshape(256, 1, 3)
+        channel_sum = np.ones((1, 3), dtype=np.float32)
 
         # Fattore di correzione per le proporzioni dei caratteri ASCII
         char_aspect_correction = 2.25
 
-        def convert_frame_to_ascii_color(frame):
+        # Buffer di lavoro riutilizzati da ciascun thread del pool di conversione
+        thread_buffers = threading.local()
+
+        def thread_buffer(name, shape, dtype=np.uint8):
+            """
+            Restituisce un buffer del thread corrente, riallocandolo solo se cambia forma.
+
+            Args:
+                name (str): Nome del buffer
+                shape (tuple): Forma richiesta
+                dtype (numpy.dtype): Tipo degli elementi, fisso per ciascun nome
+
+            Returns:
+                numpy.ndarray: Buffer riutilizzabile (contenuto non inizializzato)
+            """
+            buffer = getattr(thread_buffers, name, None)
+            if buffer is None or buffer.shape != shape:
+                buffer = np.empty(shape, dtype=dtype)
+                setattr(thread_buffers, name, buffer)
+            return buffer
+
+        def color_indices(resized):
+            """
+            Calcola l'indice (0-215) del colore del cubo 6x6x6 per ogni pixel.
+
+            Args:
+                resized (numpy.ndarray): Frame BGR ridimensionati, forma (righe, larghezza, 3)
+
+            Returns:
+                numpy.ndarray: Indici uint8 di forma (righe, larghezza), in un buffer del thread
             """
-            Converte un frame in ASCII con colori.
+            rows = resized.shape[0]
+            levels = cv2.LUT(resized, channel_lut, dst=thread_buffer('levels', resized.shape))
+            return cv2.transform(levels, channel_sum, dst=thread_buffer('colors', (rows, width)))
 
-            Versione ottimizzata con allocazioni di memoria minime e operazioni vettorizzate.
+        def cell_index_buffer(colors):
+            """
+            Copia gli indici dei colori nel buffer del thread usato per gli indici delle celle.
 
             Args:
-                frame (numpy.ndarray): Frame video da convertire
+                colors (numpy.ndarray): Indici uint8 dei colori, forma (righe, larghezza)
 
             Returns:
-                str: Rappresentazione ASCII colorata del frame
+                numpy.ndarray: Indici modificabili di tipo cell_index_dtype, in un buffer del thread
             """
-            nonlocal height_scale, last_shape
+            cell_indices = thread_buffer('cells', colors.shape, cell_index_dtype)
+            np.copyto(cell_indices, colors)
+            return cell_indices
 
-            # Ridimensiona il frame alla larghezza desiderata
-            height, width_frame, _ = frame.shape
+        def output_buffer(cell_table, rows):
+            """
+            Restituisce il buffer del thread in cui render_cells assembla i byte delle righe.
 
-            # Calcola l'altezza proporzionale con correzione aspect ratio
-            if height_scale is None or last_shape != (height, width_frame):
-                height_scale = width / width_frame / char_aspect_correction
-                last_shape = (height, width_frame)
-                logger.info(
-                    f"Frame originale: {width_frame}x{height}, ridimensionato a: {width}x{int(height * height_scale)}")
+            La terminazione delle righe è scritta una sola volta, quando il buffer viene
+            allocato: le conversioni successive riempiono solo le colonne delle celle.
 
-            new_height = int(height * height_scale)
-            if new_height < 1:
-                new_height = 1
+            Args:
+                cell_table (numpy.ndarray): Tabella delle celle in uso
+                rows (int): Numero di righe da assemblare
 
-            # Usa INTER_NEAREST per velocità e meno artefatti in ASCII
-            resized = cv2.resize(frame, (width, new_height), interpolation=cv2.INTER_NEAREST)
+            Returns:
+                numpy.ndarray: Buffer uint8 (righe, larghezza * K + len(ROW_END))
+            """
+            shape = (rows, width * cell_table.shape[1] + len(ROW_END))
+            buffer = getattr(thread_buffers, 'output', None)
+            if buffer is None or buffer.shape != shape:
+                buffer = thread_buffer('output', shape)
+                buffer[:, -len(ROW_END):] = np.frombuffer(ROW_END, dtype=np.uint8)
+            return buffer
+
+        @lru_cache(maxsize=None)
+        def output_height(frame_shape):
+            """
+            Calcola l'altezza dell'output ASCII per un frame, con correzione aspect ratio.
 
-            # Calcola direttamente la luminosità con cvtColor
-            gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
+            Il risultato è memorizzato per forma: viene calcolato (e registrato nel log)
+            solo alla prima occorrenza di ogni risoluzione, anche tra thread diversi.
+
+            Args:
+                frame_shape (tuple): Forma (altezza, larghezza, canali) del frame originale
+
+            Returns:
+                int: Altezza in righe dell'output (almeno 1)
+            """
+            height, width_frame = frame_shape[:2]
+            new_height = max(1, int(height * (width / width_frame / char_aspect_correction)))
+            logger.info(f"Frame originale: {width_frame}x{height}, ridimensionato a: {width}x{new_height}")
+            return new_height
+
+        def convert_frame_to_ascii_color(resized):
+            """
+            Converte in ASCII con colori uno o più frame già ridimensionati.
 
-            # Estrai canali di colore come viste
-            b = resized[:, :, 0]
-            g = resized[:, :, 1]
-            r = resized[:, :, 2]
+            Più frame possono essere impilati in verticale in un unico array: ogni riga
+            è indipendente, quindi le lookup e l'assemblaggio avvengono in una sola passata.
 
-            # Calcola gli indici di colore in un'unica operazione vettorizzata
-            r_idx = np.minimum(5, r // 43).astype(np.int_)  # 255 / 6 ≈ 43
-            g_idx = np.minimum(5, g // 43).astype(np.int_)
-            b_idx = np.minimum(5, b // 43).astype(np.int_)
+            Args:
+                resized (numpy.ndarray): Frame BGR ridimensionati, forma (righe, larghezza, 3)
 
-            # Normalizza i valori di grigio per la mappatura dei caratteri
-            indices = (gray / 255.0 * (len(ascii_chars) - 1)).astype(np.int_)
+            Returns:
+                list: Righe della rappresentazione ASCII colorata (bytes UTF-8)
+            """
+            rows = resized.shape[0]
 
-            # Costruisci le righe con liste e join (efficiente)
-            rows = []
-            for y in range(new_height):
-                row_chars = []
-                for x in range(width):
-                    # Ottieni il carattere ASCII in base alla luminosità
-                    char = ascii_chars[indices[y, x]]
+            # Calcola direttamente la luminosità con cvtColor
+            gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY, dst=thread_buffer('gray', (rows, width)))
+
+            colors = color_indices(resized)
 
-                    # Usa i valori precalcolati per il codice colore
-                    color_code = color_lookup[r_idx[y, x], g_idx[y, x], b_idx[y, x]]
+            # Mappa la luminosità sull'indice del carattere con un'unica lookup
+            if brightness_lut is not None:
+                indices = cv2.LUT(gray, brightness_lut, dst=thread_buffer('chars', (rows, width)))
+            else:
+                indices = brightness_to_index[gray]
 
-                    # Usa le sequenze colore precalcolate
-                    row_chars.append(color_sequences[color_code] + char)
+            # Omette la sequenza colore se coincide con quella della cella a sinistra;
+            # la prima colonna la conserva, così ogni riga resta autonoma
+            same_color = colors[:, 1:] == colors[:, :-1]
 
-                # Unisci l'intera riga con reset alla fine
-                rows.append(''.join(row_chars) + RESET_SEQ)
+            # Indice della cella (colore, carattere) per ogni pixel
+            cell_indices = cell_index_buffer(colors)
+            cell_indices *= char_count
+            cell_indices += indices
+            np.copyto(cell_indices[:, 1:], plain_cells_offset + indices[:, 1:], where=same_color)
 
-            # Unisci tutte le righe in un'unica stringa
-            return '\n'.join(rows)
+            # Assembla tutte le righe in un'unica passata vettoriale
+            return render_cells(char_cell_table, cell_indices, ROW_END, output_buffer(char_cell_table, rows))
 
-        def convert_frame_to_ascii_color_blocks(frame):
+        def convert_frame_to_ascii_color_blocks(resized):
             """
-            Converte un frame in blocchi colorati Unicode.
+            Converte in blocchi colorati Unicode uno o più frame già ridimensionati.
 
             Versione specifica per la modalità 'box' che usa caratteri blocco.
 
             Args:
-                frame (numpy.ndarray): Frame video da convertire
+                resized (numpy.ndarray): Frame BGR ridimensionati, forma (righe, larghezza, 3)
 
             Returns:
-                str: Rappresentazione con blocchi Unicode colorati
+                list: Righe della rappresentazione con blocchi Unicode colorati (bytes UTF-8)
             """
-            nonlocal height_scale, last_shape
+            # Indice della cella (colore) per ogni pixel
+            cell_indices = cell_index_buffer(color_indices(resized))
+
+            # Omette la sequenza colore se coincide con quella della cella a sinistra;
+            # la prima colonna la conserva, così ogni riga resta autonoma
+            same_color = cell_indices[:, 1:] == cell_indices[:, :-1]
+            np.copyto(cell_indices[:, 1:], plain_cells_offset, where=same_color)
+            return render_cells(block_cell_table, cell_indices, ROW_END,
+                                output_buffer(block_cell_table, resized.shape[0]))
+
+        # Ridimensionamento su GPU se OpenCV è compilato con CUDA e c'è un dispositivo:
+        # sulla PCIe torna solo il frame ridotto, molto più piccolo dell'originale
+        try:
+            use_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except (AttributeError, cv2.error):
+            use_cuda = False
+        if use_cuda:
+            logger.info("Ridimensionamento dei frame su GPU CUDA")
+
+        def resize_frame(frame, new_height, dst=None):
+            """
+            Ridimensiona un frame alla larghezza di output, su GPU se disponibile.
+
+            Con CUDA ogni thread del pool riusa il proprio stream e le proprie GpuMat,
+            evitando riallocazioni sul dispositivo a ogni frame.
+
+            Args:
+                frame (numpy.ndarray): Frame BGR originale
+                new_height (int): Altezza in righe dell'output
+                dst (numpy.ndarray, optional): Buffer di destinazione (new_height, larghezza, 3)
+
+            Returns:
+                numpy.ndarray: Frame ridimensionato
+            """
+            # Usa INTER_NEAREST per velocità e meno artefatti in ASCII
+            if not use_cuda:
+                return cv2.resize(frame, (width, new_height), dst=dst, interpolation=cv2.INTER_NEAREST)
+
+            if not hasattr(thread_buffers, 'cuda_stream'):
+                thread_buffers.cuda_stream = cv2.cuda_Stream()
+                thread_buffers.gpu_frame = cv2.cuda_GpuMat()
+                thread_buffers.gpu_resized = cv2.cuda_GpuMat()
+
+            stream = thread_buffers.cuda_stream
+            thread_buffers.gpu_frame.upload(frame, stream)
+            cv2.cuda.resize(thread_buffers.gpu_frame, (width, new_height), dst=thread_buffers.gpu_resized,
+                            interpolation=cv2.INTER_NEAREST, stream=stream)
+            resized = thread_buffers.gpu_resized.download(stream, dst)
+            stream.waitForCompletion()
+            return resized
+
+        @lru_cache(maxsize=None)
+        def slot_view(slot, shape):
+            """
+            Restituisce la vista NumPy di uno slot di memoria condivisa, creata una sola volta per forma.
+
+            Args:
+                slot (int): Indice dello slot
+                shape (tuple): Forma del frame contenuto nello slot
+
+            Returns:
+                numpy.ndarray: Vista uint8 (altezza, larghezza, canali) sullo slot, senza copie
+            """
+            return np.frombuffer(frame_slots[slot], dtype=np.uint8,
+                                 count=shape[0] * shape[1] * shape[2]).reshape(shape)
+
+        def release_frames(items):
+            """
+            Restituisce al reader gli slot di memoria condivisa dei frame indicati.
+
+            Args:
+                items (list): Elementi del batch (slot condivisi o frame)
+            """
+            for item in items:
+                if isinstance(item, tuple):
+                    free_slots.put(item[0])
 
-            # Ridimensiona il frame alla larghezza desiderata
-            height, width_frame, _ = frame.shape
+        # Ultimo frame ridimensionato convertito e relative righe, condiviso tra i thread del pool
+        last_converted = (None, None)
 
-            # Calcola l'altezza proporzionale
-            if height_scale is None or last_shape != (height, width_frame):
-                height_scale = width / width_frame / char_aspect_correction
-                last_shape = (height, width_frame)
-                logger.info(
-                    f"Frame originale: {width_frame}x{height}, ridimensionato a: {width}x{int(height * height_scale)}")
+        def convert_batch(convert_function, items):
+            """
+            Converte un batch di frame con un'unica passata vettoriale.
+
+            I frame sono letti direttamente dagli slot di memoria condivisa, senza copie,
+            e ridimensionati uno sotto l'altro in un unico buffer: lookup colori, caratteri
+            e assemblaggio dei byte avvengono una sola volta per tutto il batch. Gli slot
+            vengono liberati appena terminato il ridimensionamento.
+
+            Un frame ridimensionato identico al precedente (scene statiche) non viene
+            convertito: l'output dipende solo dal frame ridimensionato, quindi riusarne
+            le righe dà esattamente lo stesso risultato.
+
+            Args:
+                convert_function (callable): Funzione di conversione dei frame ridimensionati
+                items (list): Slot condivisi (indice, forma) o frame video
+
+            Returns:
+                list: Frame convertiti, ciascuno come lista di righe
+            """
+            try:
+                frames = [slot_view(*item) if isinstance(item, tuple) else item for item in items]
+                heights = [output_height(frame.shape) for frame in frames]
+
+                # Frame con altezze diverse (cambio di risoluzione): conversione separata
+                if len(set(heights)) > 1:
+                    return [convert_function(resize_frame(frame, new_height))
+                            for frame, new_height in zip(frames, heights)]
+
+                new_height = heights[0]
+                resized = thread_buffer('resized', (len(frames) * new_height, width, 3))
+                for i, frame in enumerate(frames):
+                    resize_frame(frame, new_height, dst=resized[i * new_height:(i + 1) * new_height])
+            finally:
+                release_frames(items)
+
+            nonlocal last_converted
+            previous, previous_rows = last_converted
+
+            # Compatta in testa al buffer i soli frame distinti; per gli altri annota quale
+            # frame distinto riusare (-1 = l'ultimo frame convertito prima di questo batch)
+            sources = []
+            unique = 0
+            for i in range(len(items)):
+                block = resized[i * new_height:(i + 1) * new_height]
+                reference = resized[(unique - 1) * new_height:unique * new_height] if unique else previous
+                if reference is not None and np.array_equal(block, reference):
+                    sources.append(unique - 1)
+                    continue
+                if unique != i:
+                    resized[unique * new_height:(unique + 1) * new_height] = block
+                sources.append(unique)
+                unique += 1
+
+            if not unique:
+                return [previous_rows] * len(items)
+
+            rows = convert_function(resized[:unique * new_height])
+            converted = [rows[i * new_height:(i + 1) * new_height] for i in range(unique)]
+            last_converted = (resized[(unique - 1) * new_height:unique * new_height].copy(), converted[-1])
+            return [converted[source] if source >= 0 else previous_rows for source in sources]
+
+        def timed_convert(convert_function, items):
+            """
+            Converte un batch di frame misurandone il tempo effettivo di conversione.
 
-            new_height = int(height * height_scale)
-            if new_height < 1:
-                new_height = 1
+            Args:
+                convert_function (callable): Funzione di conversione dei frame ridimensionati
+                items (list): Slot condivisi (indice, forma) o frame video
 
-            # Resize ottimizzato per blocchi
-            resized = cv2.resize(frame, (width, new_height), interpolation=cv2.INTER_NEAREST)
+            Returns:
+                tuple: (frame convertiti, tempo di conversione in secondi)
+            """
+            start_time = time.perf_counter()
+            ascii_frames = convert_batch(convert_function, items)
+            return ascii_frames, time.perf_counter() - start_time
 
-            # Estrai i canali come viste
-            b = resized[:, :, 0]
-            g = resized[:, :, 1]
-            r = resized[:, :, 2]
+        def send_ascii_frames(first_index, ascii_frames):
+            """
+            Invia i frame ASCII alla coda di rendering.
 
-            # Calcola indici colore in operazione vettorizzata
-            r_idx = np.minimum(5, r // 43).astype(np.int_)
-            g_idx = np.minimum(5, g // 43).astype(np.int_)
-            b_idx = np.minimum(5, b // 43).astype(np.int_)
+            Di norma attende che si liberi spazio: è questa attesa a mantenere la lettura al
+            passo con la riproduzione, perché la coda è quasi sempre piena. Il renderer è
+            considerato bloccato solo se non preleva nulla per più del doppio del tempo di
+            riproduzione dell'elemento più grande visto finora, più un margine: in quel caso
+            scarta l'elemento più vecchio in coda invece di quello nuovo, così alla ripresa
+            mostra frame recenti e la latenza resta limitata alla dimensione della coda.
 
-            # Carattere blocco Unicode
-            block_char = '█'
+            Args:
+                first_index (int): Indice progressivo del primo frame, che conta anche i frame scartati
+                ascii_frames (list): Frame ASCII convertiti, in ordine
+            """
+            nonlocal dropped_frames, largest_item
 
-            # Costruzione efficiente dell'output
-            rows = []
-            for y in range(new_height):
-                row_chars = []
-                for x in range(width):
-                    # Accedi direttamente alla lookup table
-                    color_code = color_lookup[r_idx[y, x], g_idx[y, x], b_idx[y, x]]
-                    row_chars.append(color_sequences[color_code] + block_char)
+            largest_item = max(largest_item, len(ascii_frames))
+            stall_timeout = RENDERER_STALL_MARGIN
+            if frame_interval:
+                stall_timeout += 2 * frame_interval * largest_item
 
-                # Unisci con reset
-                rows.append(''.join(row_chars) + RESET_SEQ)
+            # Attesa a intervalli brevi per reagire subito all'arresto della pipeline
+            deadline = time.monotonic() + stall_timeout
+            while True:
+                try:
+                    ascii_queue.put((first_index, ascii_frames), block=True, timeout=0.5)
+                    return
+                except queue.Full:
+                    if should_stop.is_set():
+                        return
+                    if time.monotonic() >= deadline:
+                        break
 
-            # Output finale
-            return '\n'.join(rows)
+            # Il converter è l'unico produttore: dopo il prelievo c'è sicuramente spazio
+            try:
+                _, oldest = ascii_queue.get(block=False)
+                dropped_frames += len(oldest)
+                logger.debug(f"Renderer in ritardo, scartati {len(oldest)} frame meno recenti")
+            except queue.Empty:
+                pass
+            ascii_queue.put((first_index, ascii_frames), block=False)
 
         # Tracciamento performance
         conversion_times = []
         max_times_to_track = 50  # Campioni per media mobile
+        batches_converted = 0
 
-        # Loop principale di conversione
-        while not should_stop.is_set():
-            try:
-                # Ottieni un batch di frame dalla coda
-                batch = frame_queue.get(block=True, timeout=1)
-
-                # Controlla se è il marker di fine video
-                if batch == END_OF_VIDEO_MARKER:
-                    logger.info("Ricevuto marker di fine video")
-                    # Passa il marker al renderer
-                    ascii_queue.put(END_OF_VIDEO_MARKER, block=True, timeout=1)
-                    break
+        # Frame ricevuti dal reader (inclusi quelli scartati) ed elemento più grande inviato
+        frames_received = 0
+        largest_item = 1
 
-                # Misura il tempo di conversione
-                start_time = time.time()
+        # Pool di thread persistente: resize e operazioni NumPy rilasciano il GIL.
+        # Ogni batch è un task; i risultati restano in una deque FIFO per preservare l'ordine.
+        # Le funzioni OpenCV restano single-thread: il parallelismo è a livello di frame
+        # e i thread interni di OpenCV competerebbero con quelli del pool.
+        cv2.setNumThreads(1)
+        max_in_flight = 2 * multiprocessing.cpu_count()
+        tasks_dispatched = 0
 
-                # Seleziona funzione di conversione appropriata
-                convert_function = convert_frame_to_ascii_color_blocks if box_palette else convert_frame_to_ascii_color
+        def collect_pending(keep=0):
+            """
+            Ritira in ordine i frame convertiti e li invia alla coda di rendering.
 
-                # Gestione adattiva di carico basata sullo stato della coda
-                queue_ratio = ascii_queue.qsize() / ascii_queue._maxsize if hasattr(ascii_queue,
-                                                                                    '_maxsize') and ascii_queue._maxsize else 0
+            Attende i frame in testa finché ne restano in volo al più `keep`, poi ritira
+            senza attendere quelli già pronti. Ogni task completato diventa un elemento
+            distinto della coda ASCII, così il limite della coda continua a contare batch
+            e non gruppi di batch accorpati.
 
-                if queue_ratio > 0.8 and len(batch) > 2:
-                    # Converti solo parte del batch se la coda è quasi piena
-                    process_batch = batch[:len(batch) // 2]
-                    logger.debug(
-                        f"Coda ASCII quasi piena ({queue_ratio:.1%}), processando batch ridotto: {len(process_batch)}/{len(batch)}")
-                else:
-                    process_batch = batch
+            Args:
+                keep (int): Numero massimo di conversioni da lasciare in volo
+            """
+            nonlocal batches_converted
 
-                # Converti i frame in ASCII
-                ascii_frames = [convert_function(frame) for frame in process_batch]
+            while pending and (len(pending) > keep or pending[0][1].done()):
+                first_index, future = pending.popleft()
+                if not log_performance:
+                    send_ascii_frames(first_index, future.result())
+                    continue
 
-                conversion_time = time.time() - start_time
+                batch_frames, conversion_time = future.result()
+                send_ascii_frames(first_index, batch_frames)
 
-                # Tracciamento performance
-                conversion_times.append(conversion_time)
+                # Tracciamento performance con il tempo reale per frame del batch
+                conversion_times.append(conversion_time / len(batch_frames))
                 if len(conversion_times) > max_times_to_track:
                     conversion_times.pop(0)
 
                 # Log periodico dei tempi medi
-                if len(conversion_times) % 10 == 0:
+                batches_converted += 1
+                if batches_converted % 10 == 0:
                     avg_time = sum(conversion_times) / len(conversion_times)
-                    frames_per_sec = len(process_batch) / conversion_time
-                    logger.debug(f"Tempo medio conversione: {avg_time:.4f}s, {frames_per_sec:.1f} frame/s")
+                    logger.debug(f"Tempo medio conversione: {avg_time:.4f}s per frame, {len(pending)} task in volo, "
+                                 f"{dropped_frames} frame scartati")
+
+        # La funzione di conversione non cambia durante la riproduzione:
+        # scelta una sola volta fuori dal loop
+        convert_function = convert_frame_to_ascii_color_blocks if box_palette else convert_frame_to_ascii_color
+
+        # I tempi di conversione si misurano solo se richiesto
+        worker = timed_convert if log_performance else convert_batch
 
-                # Invia i frame ASCII alla coda di rendering
+        def conversion_worker(tasks, core=None):
+            """
+            Thread del pool: converte i batch della propria coda fino al marker None.
+
+            Args:
+                tasks (queue.SimpleQueue): Coda dedicata di coppie (Future, batch)
+                core (int, optional): Core su cui fissare il thread
+            """
+            if core is not None:
+                pin_to_cores({core})
+
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                future, items = task
+                # Task annullato durante l'arresto: restituisce solo gli slot
+                if not future.set_running_or_notify_cancel():
+                    release_frames(items)
+                    continue
                 try:
-                    ascii_queue.put(ascii_frames, block=True, timeout=0.5)
-                except queue.Full:
-                    # Gestione adattiva overflow coda
-                    if len(ascii_frames) > 1:
-                        reduced_size = max(1, len(ascii_frames) // 2)
+                    future.set_result(worker(convert_function, items))
+                except Exception as e:
+                    future.set_exception(e)
+
+        # Ogni thread ha una coda dedicata, alimentata a turno: il converter contende
+        # il lock di una coda con un solo worker invece che con l'intero pool
+        for i in range(multiprocessing.cpu_count()):
+            core = worker_cores[i % len(worker_cores)] if worker_cores else None
+            worker_queues.append(queue.SimpleQueue())
+            threading.Thread(target=conversion_worker, args=(worker_queues[-1], core), daemon=True).start()
+
+        def submit(first_index, items):
+            """
+            Accoda un task al prossimo worker, a turno, rispettando la finestra di task in volo.
+
+            Args:
+                first_index (int): Indice progressivo del primo frame del task, che conta anche i frame scartati
+                items (list): Slot condivisi (indice, forma) o frame video da convertire
+            """
+            nonlocal tasks_dispatched
+
+            if len(pending) >= max_in_flight:
+                collect_pending(keep=max_in_flight - 1)
+            future = Future()
+            worker_queues[tasks_dispatched % len(worker_queues)].put((future, items))
+            pending.append((first_index, future))
+            tasks_dispatched += 1
+
+        # Loop principale di conversione
+        while not should_stop.is_set():
+            try:
+                # Con conversioni in volo non attende nuovi frame: prima ritira i risultati.
+                # Altrimenti resta in attesa sulla coda, senza polling: l'arresto arriva con il
+                # marker None, il timeout serve solo a ricontrollare should_stop
+                try:
+                    if pending:
+                        batch = frame_queue.get(block=False)
+                    else:
+                        batch = frame_queue.get(block=True, timeout=1)
+                except queue.Empty:
+                    if pending:
+                        collect_pending()
+                    continue
+
+                # Marker di arresto inserito da VideoPipeline.stop()
+                if batch is None:
+                    break
+
+                # Controlla se è il marker di fine video
+                if batch == END_OF_VIDEO_MARKER:
+                    logger.info("Ricevuto marker di fine video")
+                    # Completa le conversioni in corso prima di passare il marker al renderer
+                    collect_pending()
+                    # Attende il renderer quanto serve: un elemento lento da riprodurre non
+                    # deve far perdere il marker
+                    while not should_stop.is_set():
                         try:
-                            # Prova con batch dimezzato
-                            ascii_queue.put(ascii_frames[:reduced_size], block=False)
-                            logger.warning(f"Coda ASCII piena, ridotto batch a {reduced_size}")
+                            ascii_queue.put(END_OF_VIDEO_MARKER, block=True, timeout=0.5)
+                            break
                         except queue.Full:
-                            # Prova con singolo frame
-                            try:
-                                ascii_queue.put([ascii_frames[0]], block=False)
-                                logger.warning("Coda ancora piena, inviando un singolo frame")
-                            except queue.Full:
-                                logger.warning("Impossibile inviare frame, coda completamente piena")
-                    else:
-                        logger.warning("Impossibile inviare frame ASCII, coda piena")
+                            continue
+                    break
+
+                batch_start = frames_received
+                frames_received += len(batch)
+
+                # Un batch più grande del pool è diviso in un task per worker: i primi frame
+                # arrivano al renderer senza attendere la conversione dell'intero batch.
+                # Il batch non viene ridotto se la coda ASCII è quasi piena: senza pacing nel
+                # reader lo è anche durante la riproduzione regolare; un renderer davvero
+                # bloccato è gestito da send_ascii_frames
+                chunk_size = -(-len(batch) // len(worker_queues))
+                for start in range(0, len(batch), chunk_size):
+                    submit(batch_start + start, batch[start:start + chunk_size])
+
+                # Invia subito i frame già pronti senza attendere gli altri
+                collect_pending(keep=max_in_flight)
 
-            except queue.Empty:
-                # Nessun frame disponibile
-                time.sleep(0.05)
             except Exception as e:
-                logger.error(f"Errore nel processo di conversione: {e}")
+                logger.error(f"Errore nel thread di conversione: {e}")
     except Exception as e:
-        logger.error(f"Errore generale nel processo di conversione: {e}")
+        logger.error(f"Errore generale nel thread di conversione: {e}")
     finally:
-        logger.info("Processo di conversione frame terminato")
+        # Annulla i task non ancora avviati, poi ferma i worker
+        for _, future in pending:
+            future.cancel()
+        for tasks in worker_queues:
+            tasks.put(None)
+        if log_performance:
+            logger.info(f"Frame scartati per coda ASCII piena: {dropped_frames}")
+        logger.info("Thread di conversione frame terminato")
 
 
 class VideoPipeline:
@@ -406,11 +927,12 @@ class VideoPipeline:
         log_fps (bool): Se True, registra le informazioni sugli FPS
         loop_video (bool): Se True, riavvia il video quando raggiunge la fine
         enable_audio (bool): Se True, riproduce l'audio del video
+        audio_sync (bool): Se True, l'audio viene risincronizzato sul video
     """
 
     def __init__(self, video_path, width, target_fps=None, batch_size=1,
                  log_performance=False, log_fps=False, ascii_palette=None, loop_video=True,
-                 enable_audio=False):
+                 enable_audio=False, audio_sync=True):
         """
         Inizializza la pipeline video.
 
@@ -424,6 +946,7 @@ class VideoPipeline:
             ascii_palette (str, optional): Stringa di caratteri ASCII da usare per la conversione
             loop_video (bool): Se True, riavvia il video quando raggiunge la fine
             enable_audio (bool): Se True, riproduce l'audio del video
+            audio_sync (bool): Se False, l'audio scorre indipendente dal video, scritto a grandi blocchi
         """
         self.video_path = video_path
         self.width = width
@@ -434,6 +957,7 @@ class VideoPipeline:
         self.ascii_palette = ascii_palette
         self.loop_video = loop_video
         self.enable_audio = enable_audio
+        self.audio_sync = audio_sync
 
         # Flag per indicare che il video è finito
         self.video_finished = multiprocessing.Event()
@@ -441,7 +965,11 @@ class VideoPipeline:
         # Code di comunicazione tra processi
         queue_size = max(10, batch_size * 3)
         self.frame_queue = multiprocessing.Queue(maxsize=queue_size)
-        self.ascii_queue = multiprocessing.Queue(maxsize=queue_size)
+        # Converter e renderer condividono il processo: i frame ASCII non vengono serializzati
+        self.ascii_queue = queue.Queue(maxsize=queue_size)
+
+        # Indici degli slot di memoria condivisa liberi per i frame grezzi
+        self.free_slots = multiprocessing.Queue()
 
         # Flag per la terminazione
         self.should_stop = multiprocessing.Event()
@@ -457,9 +985,19 @@ class VideoPipeline:
 
         # Attributi per i processi
         self.reader_process = None
-        self.converter_process = None
+        self.converter_thread = None
         self.renderer_thread = None
 
+        # Intervallo minimo tra due frame renderizzati (None = nessuna limitazione)
+        self.frame_interval = None
+
+        # Core disponibili per il pinning di renderer e worker (None = nessun pinning)
+        self.pinned_cores = None
+
+        # Ridimensionamento del terminale segnalato da SIGWINCH, gestito dal renderer
+        self.terminal_resized = False
+        self._previous_sigwinch_handler = None
+
         # Attributi per l'audio
         self.audio_player = None
         self.video_duration = None
@@ -470,7 +1008,7 @@ class VideoPipeline:
         if self.enable_audio:
             try:
                 from audio_player import AudioPlayer
-                self.audio_player = AudioPlayer(video_path, target_fps)
+                self.audio_player = AudioPlayer(video_path, target_fps, sync_enabled=audio_sync)
                 self.logger.info("Player audio inizializzato")
             except ImportError as e:
                 self.logger.error(f"Impossibile inizializzare l'audio: {e}")
@@ -495,6 +1033,9 @@ class VideoPipeline:
         renderer_logger.info("Avvio thread di rendering frame")
         self.logger.info("Thread di rendering avviato")
 
+        if self.pinned_cores:
+            pin_to_cores({self.pinned_cores[0]})
+
         # Buffer di output ottimizzato
         output_buffer = TerminalOutputBuffer(sys.stdout, max_buffer_size=512 * 1024)
 
@@ -514,6 +1055,7 @@ class VideoPipeline:
         stats_update_interval = 5  # Aggiorna le statistiche ogni X frame
         max_graph_points = 50  # Numero massimo di punti nel grafico
         first_frame = True
+        prev_frame_lines = None  # Righe dell'ultimo frame scritto, per il rendering parziale
 
         # Buffer per il grafico degli ultimi frame times
         recent_frame_times = []
@@ -713,7 +1255,7 @@ class VideoPipeline:
                 try:
                     # Ottieni batch di frame ASCII
                     try:
-                        ascii_frames = self.ascii_queue.get(block=True, timeout=0.5)
+                        item = self.ascii_queue.get(block=True, timeout=0.5)
                     except queue.Empty:
                         # Controllo fine video
                         if hasattr(self,
@@ -723,21 +1265,25 @@ class VideoPipeline:
                         continue
 
                     # Controllo marker fine video
-                    if ascii_frames == END_OF_VIDEO_MARKER:
+                    if item == END_OF_VIDEO_MARKER:
                         renderer_logger.info("Ricevuto marker di fine video, terminazione del renderer")
                         self.logger.info("Video terminato, chiusura thread renderer")
                         self.should_stop.set()
                         break
 
+                    # L'indice del primo frame include i frame scartati dal converter
+                    first_index, ascii_frames = item
+
                     # Renderizza ciascun frame
-                    for ascii_frame in ascii_frames:
+                    for frame_index, frame_lines in enumerate(ascii_frames, start=first_index + 1):
                         if self.should_stop.is_set():
                             break
 
-                        # Incrementa contatore frame
+                        # Incrementa contatore frame; la posizione nel video segue invece
+                        # la numerazione del converter, così i frame scartati non la ritardano
                         frame_count += 1
                         if hasattr(self, 'current_frame'):
-                            self.current_frame = frame_count
+                            self.current_frame = frame_index
 
                         # Tempo corrente
                         current_time = time.time()
@@ -745,15 +1291,18 @@ class VideoPipeline:
                         # Gestione timing con target FPS
                         if last_frame_time is not None:
                             elapsed = current_time - last_frame_time
-                            if self.target_fps and elapsed < 1.0 / self.target_fps:
-                                sleep_time = 1.0 / self.target_fps - elapsed
+                            if self.frame_interval and elapsed < self.frame_interval:
+                                sleep_time = self.frame_interval - elapsed
                                 if sleep_time > 0.001:  # Solo se > 1ms
                                     time.sleep(sleep_time)
 
-                        # Pulizia schermo solo al primo frame
-                        if first_frame:
+                        # Pulizia schermo al primo frame e dopo un ridimensionamento del terminale,
+                        # che invalida il contenuto usato per il rendering parziale
+                        if first_frame or self.terminal_resized:
                             output_buffer.write(CLEAR_SCREEN)
                             first_frame = False
+                            self.terminal_resized = False
+                            prev_frame_lines = None
 
                         # Sincronizzazione audio-video
                         if hasattr(self, 'enable_audio') and self.enable_audio and \
@@ -781,12 +1330,26 @@ class VideoPipeline:
                                 # Visualizzazione completa
                                 fps_display = f"\n\n{fps_stats}\n{frame_time_graph}"
 
-                        # Rendering frame
-                        output_buffer.write(CURSOR_HOME)
-                        output_buffer.write(ascii_frame)
-
-                        # Aggiungi statistiche FPS
+                        # Rendering frame: se le dimensioni non cambiano riscrive solo le righe
+                        # modificate, altrimenti l'intero frame
+                        # Le righe arrivano già separate dal converter
+                        if prev_frame_lines is None or len(frame_lines) != len(prev_frame_lines):
+                            output_buffer.write(CURSOR_HOME)
+                            output_buffer.write(b'\n'.join(frame_lines))
+                        elif frame_lines != prev_frame_lines:
+                            # Un frame identico al precedente non scrive nulla (un solo confronto).
+                            # Posizionamento cursore e riga in un'unica stringa formattata,
+                            # con una sola scrittura nel buffer per tutte le righe modificate
+                            output_buffer.write(b''.join([
+                                b"\033[%d;1H%b" % (i + 1, line)
+                                for i, (line, prev_line) in enumerate(zip(frame_lines, prev_frame_lines))
+                                if line != prev_line
+                            ]))
+                        prev_frame_lines = frame_lines
+
+                        # Aggiungi statistiche FPS sotto l'ultima riga del frame
                         if fps_display:
+                            output_buffer.write(f"\033[{len(frame_lines)};1H")
                             output_buffer.write(fps_display)
 
                         # Flush per visualizzazione
@@ -835,21 +1398,43 @@ class VideoPipeline:
         """
         self.logger.info("Avvio pipeline video")
 
+        # Metadati del container: dimensioni dei frame, numero frame e durata
+        cap = cv2.VideoCapture(self.video_path)
+        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        # La cadenza di riproduzione è gestita dal renderer: target FPS, ma mai oltre gli FPS del video
+        if self.target_fps:
+            playback_fps = min(self.target_fps, video_fps) if video_fps > 0 else self.target_fps
+            self.frame_interval = 1.0 / playback_fps
+
+        # Slot di memoria condivisa per i frame grezzi: reader e converter si scambiano
+        # solo gli indici, senza serializzare i pixel di ogni frame.
+        # Quando sono tutti occupati il reader attende che il converter ne liberi uno.
+        frame_slots = None
+        if frame_width > 0 and frame_height > 0:
+            slot_count = 2 * self.batch_size + 2 * multiprocessing.cpu_count()
+            frame_slots = [multiprocessing.RawArray('B', frame_width * frame_height * 3)
+                           for _ in range(slot_count)]
+
+            # Con gli slot le code trasportano solo indici e forme: se disponibile si usa faster-fifo,
+            # che evita il thread feeder e le pipe di multiprocessing.Queue
+            if FastQueue is not None:
+                self.frame_queue = FastQueue(maxsize=self.frame_queue._maxsize)
+                self.free_slots = FastQueue()
+                self.logger.info("Code inter-processo faster-fifo attive")
+
+            for slot in range(slot_count):
+                self.free_slots.put(slot)
+            self.logger.info(f"Allocati {slot_count} slot condivisi da {frame_width}x{frame_height}")
+
         # Inizializzazione audio
         if self.enable_audio:
             try:
-                import cv2
-                from moviepy import VideoFileClip
-
-                # Ottieni durata video
-                video_clip = VideoFileClip(self.video_path)
-                self.video_duration = video_clip.duration
-                video_clip.close()
-
-                # Ottieni numero frame
-                cap = cv2.VideoCapture(self.video_path)
-                self.total_frames = int(cap.get(cv2.CAP_PROP_FPS) * self.video_duration)
-                cap.release()
+                self.video_duration = self.total_frames / video_fps if video_fps else None
 
                 self.logger.info(f"Informazioni video: durata={self.video_duration}s, frames={self.total_frames}")
 
@@ -864,27 +1449,39 @@ class VideoPipeline:
                 self.logger.error(f"Errore nell'avvio dell'audio: {e}")
                 self.enable_audio = False
 
+        # Con almeno 4 core (solo Linux) renderer e worker di conversione vengono fissati su core
+        # distinti: niente migrazioni tra core e tempi tra frame più regolari. Il reader resta
+        # libero: i thread di decodifica di FFmpeg devono poter usare tutti i core
+        if hasattr(os, 'sched_getaffinity') and len(os.sched_getaffinity(0)) >= 4:
+            self.pinned_cores = sorted(os.sched_getaffinity(0))
+            self.logger.info(f"Pinning sui core {self.pinned_cores}")
+
         # Avvia processo reader
         self.reader_process = multiprocessing.Process(
             target=frame_reader_process,
             args=(
-                self.video_path, self.frame_queue, self.should_stop, self.target_fps,
-                self.batch_size, self.loop_video
+                self.video_path, self.frame_queue, self.should_stop,
+                self.batch_size, self.loop_video, frame_slots, self.free_slots
             ),
             daemon=True
         )
         self.reader_process.start()
 
-        # Avvia processo converter
-        self.converter_process = multiprocessing.Process(
-            target=frame_converter_process,
+        # Avvia thread converter
+        self.converter_thread = threading.Thread(
+            target=frame_converter_thread,
             args=(
                 self.width, self.frame_queue, self.ascii_queue, self.should_stop,
-                self.ascii_palette
+                self.ascii_palette, frame_slots, self.free_slots, self.log_performance,
+                self.pinned_cores[1:] if self.pinned_cores else None, self.frame_interval
             ),
             daemon=True
         )
-        self.converter_process.start()
+        self.converter_thread.start()
+
+        # Gestore SIGWINCH (non disponibile su Windows, installabile solo dal thread principale)
+        if hasattr(signal, 'SIGWINCH') and threading.current_thread() is threading.main_thread():
+            self._previous_sigwinch_handler = signal.signal(signal.SIGWINCH, self._handle_terminal_resize)
 
         # Avvia thread renderer
         self.renderer_thread = threading.Thread(
@@ -893,6 +1490,16 @@ class VideoPipeline:
         )
         self.renderer_thread.start()
 
+    def _handle_terminal_resize(self, signum, frame):
+        """
+        Gestore di SIGWINCH: segnala al renderer che il terminale è stato ridimensionato.
+
+        Args:
+            signum (int): Numero del segnale
+            frame: Frame di esecuzione corrente (non usato)
+        """
+        self.terminal_resized = True
+
     def stop(self):
         """
         Ferma la pipeline video con strategia ottimizzata.
@@ -905,6 +1512,11 @@ class VideoPipeline:
         # Imposta flag terminazione
         self.should_stop.set()
 
+        # Ripristina il gestore SIGWINCH precedente
+        if self._previous_sigwinch_handler is not None:
+            signal.signal(signal.SIGWINCH, self._previous_sigwinch_handler)
+            self._previous_sigwinch_handler = None
+
         # Timeout breve per evitare blocchi
         timeout = 0.5
 
@@ -935,6 +1547,12 @@ class VideoPipeline:
         except:
             pass
 
+        # Sveglia il converter in attesa sulla coda dei frame
+        try:
+            self.frame_queue.put(None, block=False)
+        except queue.Full:
+            pass
+
         # Gestione parallela dei processi
         processes_to_terminate = []
 
@@ -943,11 +1561,6 @@ class VideoPipeline:
             if self.reader_process.is_alive():
                 processes_to_terminate.append(self.reader_process)
 
-        if hasattr(self, 'converter_process') and self.converter_process and self.converter_process.is_alive():
-            self.converter_process.join(timeout=timeout)
-            if self.converter_process.is_alive():
-                processes_to_terminate.append(self.converter_process)
-
         # Termina processi bloccati
         for process in processes_to_terminate:
             try:
@@ -955,7 +1568,10 @@ class VideoPipeline:
             except Exception as e:
                 self.logger.error(f"Errore durante la terminazione del processo: {e}")
 
-        # Gestisci thread renderer
+        # Gestisci thread converter e renderer
+        if hasattr(self, 'converter_thread') and self.converter_thread and self.converter_thread.is_alive():
+            self.converter_thread.join(timeout=timeout)
+
         if hasattr(self, 'renderer_thread') and self.renderer_thread and self.renderer_thread.is_alive():
             self.renderer_thread.join(timeout=timeout)
 
@@ -1,5 +1,6 @@
+import os
 import sys
-from typing import Optional, TextIO
+from typing import Optional, TextIO, Union
 
 
 class TerminalOutputBuffer:
@@ -8,6 +9,9 @@ class TerminalOutputBuffer:
 
     Accumula testo in un buffer interno e lo scrive al terminale solo quando necessario,
     riducendo significativamente il numero di operazioni I/O e migliorando le prestazioni.
+    Il contenuto è mantenuto in bytes UTF-8 e scritto direttamente sul file descriptor
+    dello stream (o sullo stream binario sottostante), evitando il livello di codifica
+    testuale e il buffering di Python.
     """
 
     def __init__(self, stdout: Optional[TextIO] = None, max_buffer_size: int = 1024 * 1024):
@@ -18,12 +22,19 @@ class TerminalOutputBuffer:
             stdout (TextIO, optional): Stream di output, default: sys.stdout
             max_buffer_size (int): Dimensione massima del buffer in bytes prima del flush automatico
         """
-        self.buffer = []  # Lista di stringhe da combinare
+        self.buffer = []  # Lista di bytes da combinare
         self.stdout = stdout or sys.stdout
+        # Stream binario sottostante, se disponibile
+        self.raw_stdout = getattr(self.stdout, 'buffer', None)
+        # File descriptor dello stream, se reale: il flush diventa una sola chiamata os.write
+        try:
+            self.fd = self.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            self.fd = None
         self.max_buffer_size = max_buffer_size
         self.buffered_bytes = 0
 
-    def write(self, text: str) -> None:
+    def write(self, text: Union[str, bytes]) -> None:
         """
         Aggiunge testo al buffer interno.
 
@@ -32,8 +43,10 @@ class TerminalOutputBuffer:
         max_buffer_size.
 
         Args:
-            text (str): Testo da aggiungere al buffer
+            text (str | bytes): Testo o bytes UTF-8 da aggiungere al buffer
         """
+        if isinstance(text, str):
+            text = text.encode('utf-8')
         self.buffer.append(text)
         self.buffered_bytes += len(text)
 
@@ -53,9 +66,22 @@ class TerminalOutputBuffer:
 
         try:
             # Una singola operazione di scrittura per tutto il buffer
-            combined_text = ''.join(self.buffer)
-            self.stdout.write(combined_text)
-            self.stdout.flush()
+            combined = b''.join(self.buffer)
+            if self.fd is not None:
+                # Svuota eventuale output pendente di Python per preservare l'ordine
+                self.stdout.flush()
+                # os.write può scrivere solo in parte (es. pipe piena): ripete sul resto
+                view = memoryview(combined)
+                while view:
+                    view = view[os.write(self.fd, view):]
+            elif self.raw_stdout is not None:
+                # Svuota eventuale testo pendente prima di scrivere sullo stream binario
+                self.stdout.flush()
+                self.raw_stdout.write(combined)
+                self.raw_stdout.flush()
+            else:
+                self.stdout.write(combined.decode('utf-8'))
+                self.stdout.flush()
         except Exception:
             # Gestione silenziosa degli errori di I/O
             pass
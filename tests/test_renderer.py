@@ -0,0 +1,74 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import END_OF_VIDEO_MARKER, VideoPipeline
+
+CLEAR_SCREEN = b'\033[2J'
+
+
+class FrameRendererTest(unittest.TestCase):
+    """
+    Test del thread di rendering di VideoPipeline, eseguito direttamente sul thread del test.
+    """
+
+    def setUp(self):
+        # Il renderer scrive i log nella directory 'logs' della directory corrente
+        self.previous_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.previous_cwd)
+        self.temp_dir.cleanup()
+
+    def render(self, items):
+        """
+        Esegue il renderer sugli elementi indicati, seguiti dal marker di fine video.
+
+        Args:
+            items (list): Elementi della coda ASCII (indice del primo frame, frame)
+
+        Returns:
+            tuple: (output scritto sul terminale in bytes, pipeline usata)
+        """
+        pipeline = VideoPipeline('video.mp4', width=2)
+        for item in items:
+            pipeline.ascii_queue.put(item)
+        pipeline.ascii_queue.put(END_OF_VIDEO_MARKER)
+
+        output = io.BytesIO()
+        with mock.patch('sys.stdout', io.TextIOWrapper(output, encoding='utf-8')):
+            pipeline._frame_renderer_thread()
+            written = output.getvalue()
+        return written, pipeline
+
+    def test_clear_screen_only_on_first_frame(self):
+        output, _ = self.render([
+            (0, [[b'ab', b'cd']]),
+            (1, [[b'ab', b'ce'], [b'ab', b'ce']]),
+        ])
+
+        self.assertEqual(output.count(CLEAR_SCREEN), 1)
+        self.assertTrue(output.startswith(CLEAR_SCREEN))
+        # Dopo il primo frame viene riscritta solo la riga modificata, una sola volta
+        self.assertEqual(output.count(b'ce'), 1)
+        self.assertIn(b'\033[2;1Hce', output)
+
+    def test_current_frame_follows_frame_numbers(self):
+        # I frame 2-5 sono stati scartati dal converter: la posizione nel video li conta
+        _, pipeline = self.render([
+            (0, [[b'ab']]),
+            (5, [[b'cd']]),
+        ])
+
+        self.assertEqual(pipeline.current_frame, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()